@@ -12,6 +12,7 @@ import {
 import { apiKeyAuthMiddleware } from './middleware/auth.js';
 import { calculateStampDuty } from './services/stamp-duty-calculator.js';
 import { getDraft, patchDraft, calculateDraft, resetDraft, getDefaultAssumptions } from './services/feaso-draft-store.js';
+import { pdonlinePool } from './services/browser-pool.js';
 
 // Nearby DAs service
 let getNearbyDAs = async () => ({ success: false, error: 'Service not available' });
@@ -1012,4 +1013,18 @@ app.listen(PORT, () => {
   console.log(`   GET  /api/feaso/defaults  📊 NEW`);
 });
 
+// Disconnect the shared BrowserBase session on shutdown - BrowserBase bills
+// per browser-minute and an orphaned session keeps running server-side
+for (const signal of ['SIGINT', 'SIGTERM']) {
+  process.once(signal, async () => {
+    console.log(`\n[SERVER] ${signal} received - closing browser pool`);
+    try {
+      await pdonlinePool.close();
+    } catch (err) {
+      console.error('[SERVER] Error closing browser pool:', err.message);
+    }
+    process.exit(0);
+  });
+}
+
 export default app;
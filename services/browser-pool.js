@@ -0,0 +1,307 @@
+import { chromium } from 'playwright-core';
+
+// Resource types the PDOnline scrapers never read - both portals are scraped
+// for text and links only, so skipping these cuts page weight substantially
+const BLOCKED_RESOURCE_TYPES = new Set(['image', 'font', 'stylesheet', 'media']);
+
+/**
+ * Abort requests for static assets the scrapers don't need. Register once per
+ * page, before the first goto.
+ */
+export async function blockStaticAssets(page) {
+  await page.route('**/*', (route) => {
+    if (BLOCKED_RESOURCE_TYPES.has(route.request().resourceType())) {
+      return route.abort();
+    }
+    return route.continue();
+  });
+}
+
+/**
+ * Pool of warm Playwright browser contexts over a single BrowserBase connection.
+ *
+ * Connecting to BrowserBase and standing up a fresh browser costs seconds per
+ * call; the pool pays that once, then hands out isolated contexts that are
+ * recycled after maxUses checkouts or maxAgeMs of life. A background health
+ * check pings idle contexts and discards any that have gone stale.
+ */
+export class BrowserPool {
+  constructor({ minSize = 1, maxSize = 3, maxUses = 20, maxAgeMs = 10 * 60 * 1000, healthCheckMs = 30000, idleShutdownMs = 5 * 60 * 1000, acquireTimeoutMs = 120000, holdTimeoutMs = 10 * 60 * 1000 } = {}) {
+    this.minSize = minSize;
+    this.maxSize = maxSize;
+    this.maxUses = maxUses;
+    this.maxAgeMs = maxAgeMs;
+    this.healthCheckMs = healthCheckMs;
+    this.idleShutdownMs = idleShutdownMs;
+    this.acquireTimeoutMs = acquireTimeoutMs;
+    this.holdTimeoutMs = holdTimeoutMs;
+
+    this._browser = null;
+    this._connecting = null;
+    this._idle = [];          // [{ context, uses, createdAt }]
+    this._inUse = new Set();  // entries currently checked out
+    this._waiters = [];       // [{ resolve, reject, timer }] queued when pool is at maxSize
+    this._healthTimer = null;
+    this._defaultContextClaimed = false;
+    this._lastUsedAt = Date.now();
+  }
+
+  async _getBrowser() {
+    if (this._browser?.isConnected()) return this._browser;
+
+    if (!this._connecting) {
+      const browserbaseApiKey = process.env.BROWSERBASE_API_KEY;
+      const browserbaseProjectId = process.env.BROWSERBASE_PROJECT_ID;
+
+      if (!browserbaseApiKey || !browserbaseProjectId) {
+        throw new Error('BrowserBase credentials not configured');
+      }
+
+      console.log('[BROWSER-POOL] Connecting to BrowserBase...');
+      // connectOverCDP speaks the Chrome DevTools Protocol directly to
+      // BrowserBase's remote Chromium - there is no local driver process in
+      // the path, so swapping to a puppeteer-style client would change the
+      // API without removing a transport hop
+      this._connecting = chromium.connectOverCDP(
+        `wss://connect.browserbase.com?apiKey=${browserbaseApiKey}&projectId=${browserbaseProjectId}`,
+        { timeout: 30000 }
+      ).then(browser => {
+        this._browser = browser;
+        this._connecting = null;
+        // Idle entries from a previous connection are dead; in-use entries
+        // stay tracked so their holders' release() still balances the books
+        this._idle = [];
+        this._defaultContextClaimed = false;
+        this._startHealthCheck();
+        console.log('[BROWSER-POOL] ✅ Connected');
+        // Prewarm to minSize in the background so checkouts after the first
+        // find a context already standing - the connect itself stays lazy,
+        // so this never spins up a session nobody asked for
+        this.warmUp().catch(err => {
+          console.log('[BROWSER-POOL] Warm-up failed:', err.message);
+        });
+        return browser;
+      }).catch(err => {
+        this._connecting = null;
+        throw err;
+      });
+    }
+
+    return this._connecting;
+  }
+
+  async _createContext() {
+    const browser = await this._getBrowser();
+
+    // Claim the CDP connection's pre-existing default context exactly once -
+    // a one-shot flag, flipped with no await in between, so concurrent
+    // creators can never both grab it
+    if (!this._defaultContextClaimed && browser.contexts()[0]) {
+      this._defaultContextClaimed = true;
+      return browser.contexts()[0];
+    }
+
+    return browser.newContext();
+  }
+
+  _isExpired(entry) {
+    return entry.uses >= this.maxUses || Date.now() - entry.createdAt > this.maxAgeMs;
+  }
+
+  async _discard(entry) {
+    try {
+      await entry.context.close();
+    } catch (err) {
+      // Context may already be gone - nothing to clean up
+    }
+  }
+
+  /**
+   * Check out a context. Reuses a warm idle one when available, creates a new
+   * one up to maxSize, otherwise waits for a release.
+   */
+  async acquire() {
+    this._lastUsedAt = Date.now();
+
+    while (this._idle.length > 0) {
+      const entry = this._idle.pop();
+      if (this._isExpired(entry)) {
+        await this._discard(entry);
+        continue;
+      }
+      entry.uses++;
+      entry.checkedOutAt = Date.now();
+      this._inUse.add(entry);
+      return entry.context;
+    }
+
+    if (this._inUse.size < this.maxSize) {
+      // Reserve the slot synchronously, before any await - otherwise every
+      // concurrent caller passes the size check and the pool overshoots
+      // maxSize (or hands several callers the same context)
+      const entry = { context: null, uses: 1, createdAt: Date.now(), checkedOutAt: Date.now() };
+      this._inUse.add(entry);
+
+      try {
+        entry.context = await this._createContext();
+      } catch (err) {
+        this._inUse.delete(entry);
+        this._notifyWaiter();
+        throw err;
+      }
+
+      return entry.context;
+    }
+
+    // Pool is full - wait for a release, but never forever: a caller that
+    // leaked its context must not be able to hang every other caller
+    await new Promise((resolve, reject) => {
+      const waiter = { resolve, reject, timer: null };
+      waiter.timer = setTimeout(() => {
+        const index = this._waiters.indexOf(waiter);
+        if (index !== -1) this._waiters.splice(index, 1);
+        reject(new Error(`Timed out after ${this.acquireTimeoutMs}ms waiting for a browser context`));
+      }, this.acquireTimeoutMs);
+      this._waiters.push(waiter);
+    });
+    return this.acquire();
+  }
+
+  _notifyWaiter() {
+    const waiter = this._waiters.shift();
+    if (waiter) {
+      clearTimeout(waiter.timer);
+      waiter.resolve();
+    }
+  }
+
+  /**
+   * Return a context to the pool. Any pages opened on it are closed and its
+   * cookies cleared so the next checkout starts clean; expired contexts are
+   * discarded instead.
+   */
+  async release(context) {
+    // Each checkout holds a unique context (acquire reserves before creating),
+    // so tearing down this context's pages can't touch another holder's work.
+    // Double releases find no entry and fall through harmlessly.
+    const entry = [...this._inUse].find(e => e.context === context);
+    if (!entry) return;
+
+    this._lastUsedAt = Date.now();
+    this._inUse.delete(entry);
+
+    for (const page of context.pages()) {
+      try {
+        await page.close();
+      } catch (err) {
+        // Page may already be closed
+      }
+    }
+
+    if (this._isExpired(entry) || !this._browser?.isConnected()) {
+      await this._discard(entry);
+    } else {
+      try {
+        // ePathway keys its server-side session to cookies and the scrape
+        // flows expect the virgin terms click-through, so each checkout must
+        // start from fresh-session state
+        await context.clearCookies();
+        this._idle.push(entry);
+      } catch (err) {
+        console.log('[BROWSER-POOL] Could not clear cookies, discarding context:', err.message);
+        await this._discard(entry);
+      }
+    }
+
+    this._notifyWaiter();
+  }
+
+  /**
+   * Prewarm the pool to minSize idle contexts.
+   */
+  async warmUp() {
+    while (this._idle.length + this._inUse.size < this.minSize) {
+      const context = await this._createContext();
+      this._idle.push({ context, uses: 0, createdAt: Date.now() });
+    }
+  }
+
+  _startHealthCheck() {
+    if (this._healthTimer) clearInterval(this._healthTimer);
+
+    this._healthTimer = setInterval(async () => {
+      if (!this._browser?.isConnected()) return;
+
+      // BrowserBase bills per browser-minute, so don't keep an unused session
+      // alive indefinitely - disconnect and reconnect lazily on next acquire
+      if (this._inUse.size === 0 && this._waiters.length === 0 &&
+          Date.now() - this._lastUsedAt > this.idleShutdownMs) {
+        console.log(`[BROWSER-POOL] Idle for ${Math.round(this.idleShutdownMs / 60000)}min - disconnecting`);
+        await this.close();
+        return;
+      }
+
+      // Reclaim checkouts held past holdTimeoutMs - measured from checkout,
+      // not context creation, so a recycled context acquired near its age
+      // limit isn't closed out from under an active scrape. A scrape takes
+      // well under a minute, so holders this old leaked their checkout
+      // (e.g. a session never closed) and would pin pool slots until restart
+      for (const entry of [...this._inUse]) {
+        if (entry.context && Date.now() - entry.checkedOutAt > this.holdTimeoutMs) {
+          console.warn('[BROWSER-POOL] Reclaiming context held past holdTimeoutMs - holder never released it');
+          this._inUse.delete(entry);
+          await this._discard(entry);
+          this._notifyWaiter();
+        }
+      }
+
+      for (const entry of [...this._idle]) {
+        try {
+          // Cheap round-trip to confirm the context is still alive
+          await entry.context.cookies();
+        } catch (err) {
+          console.log('[BROWSER-POOL] Discarding stale context:', err.message);
+          this._idle.splice(this._idle.indexOf(entry), 1);
+          await this._discard(entry);
+        }
+      }
+    }, this.healthCheckMs);
+
+    // Don't keep the process alive just for health checks
+    this._healthTimer.unref?.();
+  }
+
+  /**
+   * Close everything - idle contexts, the browser, and the health check.
+   */
+  async close() {
+    if (this._healthTimer) {
+      clearInterval(this._healthTimer);
+      this._healthTimer = null;
+    }
+
+    for (const waiter of this._waiters.splice(0)) {
+      clearTimeout(waiter.timer);
+      waiter.reject(new Error('Browser pool closed'));
+    }
+
+    for (const entry of this._idle) {
+      await this._discard(entry);
+    }
+    this._idle = [];
+    this._inUse.clear();
+
+    if (this._browser) {
+      try {
+        await this._browser.close();
+      } catch (err) {
+        console.error('[BROWSER-POOL] Error closing browser:', err.message);
+      }
+      this._browser = null;
+    }
+  }
+}
+
+// Shared pool for PDOnline scraping - both the DA scraper and the document
+// downloader draw from this so a burst of requests reuses one connection.
+export const pdonlinePool = new BrowserPool();
@@ -10,6 +10,13 @@ const SERVICES = {
   OVERLAYS: 'https://maps1.goldcoast.qld.gov.au/arcgis/rest/services/V8_Overlays/MapServer'
 };
 
+// Lot/plan parsing patterns - compiled once here instead of per call inside
+// the hot lookup/sort paths
+const LOTPLAN_RE = /^\d+[A-Z]{2,4}\d+$/i;            // whole query is a lot/plan
+const LOTPLAN_SPLIT_RE = /^(\d+)([A-Z]{2,4}\d+)$/i;  // split into lot number + plan
+const PLAN_PART_RE = /^\d+([A-Z]{2,4}\d+)$/i;        // plan part only
+const LOT_NUMBER_RE = /^(\d+)/;                      // leading lot number
+
 // WHITELIST: Only query layers verified to return accurate data
 const VERIFIED_OVERLAY_LAYERS = [
   1, 2, 4, 5, 7, 9, 11, 13, 14, 15, 17, 18, 19, 21, 22, 24, 25, 26, 28, 31, 32, 33, 34, 36, 39, 41, 42, 43, 44,
@@ -128,8 +135,7 @@ function addressesMatch(searchedAddress, returnedAddress) {
  * Detect if query is a lot/plan or address
  */
 function detectQueryType(query) {
-  const lotplanPattern = /^\d+[A-Z]{2,4}\d+$/i;
-  if (lotplanPattern.test(query.trim())) {
+  if (LOTPLAN_RE.test(query.trim())) {
     return { type: 'lotplan', value: query.trim().toUpperCase() };
   }
   return { type: 'address', value: query };
@@ -189,8 +195,8 @@ async function getAllLotsInPlan(planNumber) {
       area: f.attributes.AREA_SIZE_SQ_M || 0,
       numberOfUnits: f.attributes.NUMBEROFUNITS || null
     })).sort((a, b) => {
-      const lotNumA = parseInt(a.lotplan.match(/^(\d+)/)?.[1] || '999');
-      const lotNumB = parseInt(b.lotplan.match(/^(\d+)/)?.[1] || '999');
+      const lotNumA = parseInt(a.lotplan.match(LOT_NUMBER_RE)?.[1] || '999');
+      const lotNumB = parseInt(b.lotplan.match(LOT_NUMBER_RE)?.[1] || '999');
       return lotNumA - lotNumB;
     });
 
@@ -517,7 +523,7 @@ async function getCadastreWithGeometry(lat, lon, unitNumber, originalAddress) {
   const isSP = lotplan.includes('SP');    // Survey Plan - could be strata or normal
   
   if (!unitNumber && (isBUP || isGTP || (isSP && lotArea < 150))) {
-    const lotMatch = lotplan.match(/^(\d+)([A-Z]{2,4}\d+)$/i);
+    const lotMatch = lotplan.match(LOTPLAN_SPLIT_RE);
     
     if (lotMatch) {
       const lotNum = parseInt(lotMatch[1]);
@@ -597,7 +603,7 @@ async function getCadastreWithGeometry(lat, lon, unitNumber, originalAddress) {
   // Handle EXPLICIT unit lookup (when user asks for "Unit 5" or "5/21 North St")
   if (unitNumber) {
     const currentLotplan = feature.attributes.LOTPLAN || '';
-    const planMatch = currentLotplan.match(/^\d+([A-Z]{2,4}\d+)$/i);
+    const planMatch = currentLotplan.match(PLAN_PART_RE);
     
     if (planMatch) {
       const specificLotPlan = `${unitNumber}${planMatch[1]}`;
@@ -679,6 +685,10 @@ async function getZone(lotGeometry) {
 
 /**
  * Get building height information using lot geometry
+ *
+ * Queries the CityPlan building height MapServer directly - there's no need
+ * to drive the eplan viewer UI (toggling the layer and screenshotting the
+ * map); the identify endpoint returns the same data as structured attributes.
  */
 async function getHeight(lotGeometry) {
   console.log(`[API] Querying height...`);
@@ -796,7 +806,7 @@ export async function scrapeProperty(query, sendProgress = null) {
         const individualUnits = [];
 
         for (const [lotplan, feature] of uniqueLotPlans.entries()) {
-          const lotMatch = lotplan.match(/^(\d+)/);
+          const lotMatch = lotplan.match(LOT_NUMBER_RE);
           const lotNum = lotMatch ? parseInt(lotMatch[1]) : null;
 
           if (lotNum === 0) {
@@ -907,7 +917,7 @@ export async function scrapeProperty(query, sendProgress = null) {
     const isStrata = returnedLotplan.includes('BUP') || returnedLotplan.includes('GTP');
     
     // Determine if this is the parent/common property or an individual unit
-    const lotNumMatch = returnedLotplan.match(/^(\d+)/);
+    const lotNumMatch = returnedLotplan.match(LOT_NUMBER_RE);
     const lotNumber = lotNumMatch ? parseInt(lotNumMatch[1]) : null;
     const isParentLot = isStrata && lotNumber === 0;  // Lot 0 = parent/common property
     const isUnitLot = isStrata && lotNumber > 0;      // Lot 1+ = individual units
@@ -921,7 +931,7 @@ export async function scrapeProperty(query, sendProgress = null) {
         console.log(`[API] This is the PARENT SITE (lot 0) of a ${numberOfUnits}-unit strata scheme`);
 
         // Extract plan number from lotplan (e.g., "BUP12345" from "0BUP12345")
-        const planMatch = returnedLotplan.match(/^(\d+)([A-Z]{2,4}\d+)$/i);
+        const planMatch = returnedLotplan.match(LOTPLAN_SPLIT_RE);
         if (planMatch) {
           const planNumber = planMatch[2]; // e.g., "BUP12345" or "GTP67890"
 
@@ -937,7 +947,7 @@ export async function scrapeProperty(query, sendProgress = null) {
 
               // Create breakdown showing each lot's area
               areaBreakdown = allLots.map(lot => {
-                const lotNum = parseInt(lot.lotplan.match(/^(\d+)/)?.[1] || '0');
+                const lotNum = parseInt(lot.lotplan.match(LOT_NUMBER_RE)?.[1] || '0');
                 const areaRounded = Math.round(lot.area);
 
                 if (lotNum === 0) {
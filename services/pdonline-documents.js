@@ -1,7 +1,10 @@
-import { chromium } from 'playwright-core';
 import fs from 'fs';
 import path from 'path';
 import Anthropic from '@anthropic-ai/sdk';
+import { pdonlinePool, blockStaticAssets } from './browser-pool.js';
+
+// Document-name pattern for stamped approved plans - shared by the page scan
+const STAMPED_PLANS_RE = /stamped.*(approved|approval).*plan|stamped.*plan/i;
 
 /**
  * Download the Decision Notice PDF for a specific DA from PDOnline.
@@ -12,28 +15,20 @@ import Anthropic from '@anthropic-ai/sdk';
  * @returns {Promise<Object>} Result object with success status, file path, and metadata
  */
 export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
-  const browserbaseApiKey = process.env.BROWSERBASE_API_KEY;
-  const browserbaseProjectId = process.env.BROWSERBASE_PROJECT_ID;
-
-  if (!browserbaseApiKey || !browserbaseProjectId) {
-    throw new Error('BrowserBase credentials not configured');
-  }
-
-  let browser;
+  let context;
 
   try {
-    browser = await chromium.connectOverCDP(
-      `wss://connect.browserbase.com?apiKey=${browserbaseApiKey}&projectId=${browserbaseProjectId}`,
-      { timeout: 25000 }
-    );
-
-    const context = browser.contexts()[0];
-    const page = context.pages()[0] || await context.newPage();
+    context = await pdonlinePool.acquire();
+    const page = await context.newPage();
     page.setDefaultTimeout(8000);
 
-    // Navigate and accept terms
-    await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { waitUntil: 'domcontentloaded' });
-    await page.click('a:has-text("All applications")');
+    // Text and PDF bytes are all we need - skip images, fonts and styles
+    await blockStaticAssets(page);
+
+    // Navigate and accept terms - wait only for the link we need, not the full load
+    await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { waitUntil: 'commit' });
+    const allApplicationsLink = await page.waitForSelector('a:has-text("All applications")', { state: 'visible' });
+    await allApplicationsLink.click();
     await page.click('input#ctl00_MainBodyContent_mDataList_ctl03_mDataGrid_ctl02_ctl00');
     await page.click('input[type="submit"][value="Next"]');
 
@@ -45,7 +40,6 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
     // Click into first result
     const firstLink = await page.$('table#gridResults tr.ContentPanel td:first-child a, table#gridResults tr.AlternateContentPanel td:first-child a');
     if (!firstLink) {
-      await browser.close();
       return { success: false, error: 'No results found for application number', filePath: null };
     }
 
@@ -54,7 +48,16 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
     // Access documents iframe
     const iframeElement = await page.waitForSelector('iframe.resp-iframe', { timeout: 12000 });
     const iframe = await iframeElement.contentFrame();
-    await iframe.waitForSelector('table.dataTable', { timeout: 15000 });
+    // The documents grid populates asynchronously inside the iframe; rechecking
+    // on each animation frame picks it up faster than interval polling
+    await iframe.waitForFunction(
+      () => {
+        const table = document.querySelector('table.dataTable');
+        return !!table && table.rows.length > 0;
+      },
+      null,
+      { polling: 'raf', timeout: 15000 }
+    );
 
     // Search all pages for decision notice
     let signedInfo = null;
@@ -63,26 +66,33 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
     let foundPage = null;
 
     while (true) {
-      const docsTable = await iframe.$('table.dataTable');
-      if (!docsTable) break;
-
-      const rows = await docsTable.$$('tr');
-
-      for (const row of rows) {
-        const cells = await row.$$('td');
-        if (cells.length >= 4) {
-          const linkText = (await cells[0].innerText()).trim();
-          const nameText = (await cells[1].innerText()).trim();
-
-          if (nameText.includes('Signed Decision Notice')) {
-            signedInfo = { linkText, name: nameText, isSigned: true, page: pageNum };
-            foundPage = pageNum;
-            break;
-          }
+      // One round-trip per page: serialize the table's row text in-page and
+      // parse locally; null means the table is gone and the scan is over
+      const rowTexts = await iframe.evaluate(() => {
+        const table = document.querySelector('table.dataTable');
+        if (!table) return null;
+        return Array.from(table.querySelectorAll('tr')).map(row => {
+          const cells = row.querySelectorAll('td');
+          if (cells.length < 4) return null;
+          return {
+            linkText: cells[0].innerText.trim(),
+            nameText: cells[1].innerText.trim()
+          };
+        }).filter(Boolean);
+      });
+      if (rowTexts === null) break;
+
+      for (const { linkText, nameText } of rowTexts) {
+        if (nameText.includes('Signed Decision Notice')) {
+          signedInfo = { linkText, name: nameText, isSigned: true, page: pageNum };
+          foundPage = pageNum;
+          break;
+        }
 
-          if (nameText.includes('Decision Notice') && !unsignedInfo && !nameText.toLowerCase().includes('cover letter')) {
-            unsignedInfo = { linkText, name: nameText, isSigned: false, page: pageNum };
-          }
+        // Cheapest guard first - once an unsigned candidate is held, the only
+        // thing left to find on this page is a signed notice
+        if (!unsignedInfo && nameText.includes('Decision Notice') && !nameText.toLowerCase().includes('cover letter')) {
+          unsignedInfo = { linkText, name: nameText, isSigned: false, page: pageNum };
         }
       }
 
@@ -96,8 +106,10 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
         break;
       }
 
-      const nextButton = await iframe.$('a:has-text("Next")');
-      if (nextButton && !(await nextButton.getAttribute('class') || '').includes('disabled')) {
+      // Fold the disabled check into the selector - one element resolution
+      // instead of a lookup plus a class-attribute round-trip
+      const nextButton = await iframe.$('a:has-text("Next"):not([class*="disabled"])');
+      if (nextButton) {
         await nextButton.click();
         await iframe.waitForLoadState('domcontentloaded');
         pageNum += 1;
@@ -110,7 +122,6 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
     const decisionInfo = signedInfo || unsignedInfo;
 
     if (!decisionInfo) {
-      await browser.close();
       return { success: false, error: 'No Decision Notice found', filePath: null };
     }
 
@@ -139,56 +150,72 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
       }
     }
 
-    // Find the download link on current page
-    const docsTable = await iframe.$('table.dataTable');
-    let decisionLink = null;
-
-    if (docsTable) {
-      const rows = await docsTable.$$('tr');
-      for (const row of rows) {
-        const cells = await row.$$('td');
-        if (cells.length >= 4) {
-          const linkText = (await cells[0].innerText()).trim();
-          if (linkText === decisionInfo.linkText) {
-            decisionLink = await cells[0].$('a');
-            break;
-          }
+    // Find the download link on current page - locate the anchor in one
+    // in-page pass instead of walking rows over the protocol
+    const linkHandle = await iframe.evaluateHandle((targetText) => {
+      for (const row of document.querySelectorAll('table.dataTable tr')) {
+        const cells = row.querySelectorAll('td');
+        if (cells.length >= 4 && cells[0].innerText.trim() === targetText) {
+          return cells[0].querySelector('a');
         }
       }
-    }
+      return null;
+    }, decisionInfo.linkText);
+    const decisionLink = linkHandle.asElement();
 
     if (!decisionLink) {
-      await browser.close();
       return { success: false, error: `Could not find link ${decisionInfo.linkText}`, filePath: null };
     }
 
-    // Intercept PDF download
+    // Try fetching the PDF straight through the context's request client -
+    // it shares the page's cookies, so a plain href skips the whole browser
+    // download path. ePathway links are often javascript postbacks, in which
+    // case we fall back to click + interception below.
     let pdfBuffer = null;
-    let interceptResolve = null;
-    const interceptPromise = new Promise((resolve) => { interceptResolve = resolve; });
 
-    const routeHandler = async (route, request) => {
-      const response = await route.fetch();
-      const contentType = response.headers()['content-type'] || '';
+    const href = await decisionLink.getAttribute('href');
+    if (href && !href.toLowerCase().startsWith('javascript')) {
+      try {
+        const pdfUrl = new URL(href, iframe.url()).toString();
+        const directResponse = await page.request.get(pdfUrl);
+        const directType = directResponse.headers()['content-type'] || '';
 
-      if (contentType.includes('application/pdf') || contentType.includes('octet-stream')) {
-        pdfBuffer = await response.body();
-        interceptResolve();
+        if (directResponse.ok() && (directType.includes('application/pdf') || directType.includes('octet-stream'))) {
+          pdfBuffer = await directResponse.body();
+        }
+      } catch (directErr) {
+        console.log('[PDONLINE-DOCS] Direct PDF fetch failed, falling back to click:', directErr.message);
       }
+    }
 
-      await route.fulfill({ response });
-    };
+    if (!pdfBuffer) {
+      // Intercept PDF download
+      let interceptResolve = null;
+      const interceptPromise = new Promise((resolve) => { interceptResolve = resolve; });
 
-    await page.route('**/*', routeHandler);
-    await decisionLink.click();
+      const routeHandler = async (route, request) => {
+        const response = await route.fetch();
+        const contentType = response.headers()['content-type'] || '';
+
+        if (contentType.includes('application/pdf') || contentType.includes('octet-stream')) {
+          pdfBuffer = await response.body();
+          interceptResolve();
+        }
 
-    const timeout = setTimeout(() => {
-      if (!pdfBuffer) interceptResolve();
-    }, 20000);
+        await route.fulfill({ response });
+      };
 
-    await interceptPromise;
-    clearTimeout(timeout);
-    await page.unroute('**/*', routeHandler);
+      await page.route('**/*', routeHandler);
+      await decisionLink.click();
+
+      const timeout = setTimeout(() => {
+        if (!pdfBuffer) interceptResolve();
+      }, 20000);
+
+      await interceptPromise;
+      clearTimeout(timeout);
+      await page.unroute('**/*', routeHandler);
+    }
 
     if (!pdfBuffer) {
       throw new Error('Failed to capture PDF');
@@ -210,8 +237,6 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
     fs.writeFileSync(filePath, pdfBuffer);
     const fileSizeKB = (pdfBuffer.length / 1024).toFixed(2);
 
-    await browser.close();
-
     return {
       success: true,
       filePath,
@@ -226,17 +251,57 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
 
   } catch (error) {
     console.error('[PDONLINE-DOCS ERROR]', error.message);
+    throw new Error(`Decision notice download failed: ${error.message}`);
+  } finally {
+    if (context) {
+      await pdonlinePool.release(context);
+    }
+  }
+}
+
+/**
+ * Download decision notices for a list of DAs concurrently.
+ *
+ * Each job checks its own context out of the shared pool so cookies and
+ * ePathway session state don't collide between parallel searches; workers
+ * are capped at the pool's capacity. Failures are captured per application
+ * rather than aborting the batch.
+ *
+ * @param {string[]} applicationNumbers - Application numbers to download
+ * @param {string} outputDir - Directory to save PDFs (default: /tmp)
+ * @param {number} concurrency - Max parallel downloads (default: 4)
+ * @returns {Promise<Array>} One result per application, in input order
+ */
+export async function getManyDecisionNotices(applicationNumbers, outputDir = '/tmp', concurrency = 4) {
+  console.log('[PDONLINE-DOCS] Batch download for', applicationNumbers.length, 'applications, max parallel:', concurrency);
+
+  const results = new Array(applicationNumbers.length);
+  let nextIndex = 0;
+
+  const worker = async () => {
+    while (nextIndex < applicationNumbers.length) {
+      const i = nextIndex++;
+      const applicationNumber = applicationNumbers[i];
 
-    if (browser) {
       try {
-        await browser.close();
-      } catch (closeError) {
-        // Silent fail on close error
+        results[i] = await getDecisionNotice(applicationNumber, outputDir);
+      } catch (err) {
+        console.error('[PDONLINE-DOCS] Batch item failed for', applicationNumber, ':', err.message);
+        results[i] = { success: false, error: err.message, filePath: null, applicationNumber };
       }
     }
+  };
 
-    throw new Error(`Decision notice download failed: ${error.message}`);
+  // Cap at pool capacity - extra workers would only queue on acquire() and
+  // could time out waiting behind the others
+  const workerCount = Math.min(concurrency, applicationNumbers.length, pdonlinePool.maxSize);
+  const workers = [];
+  for (let w = 0; w < workerCount; w++) {
+    workers.push(worker());
   }
+  await Promise.all(workers);
+
+  return results;
 }
 
 /**
@@ -247,28 +312,20 @@ export async function getDecisionNotice(applicationNumber, outputDir = '/tmp') {
  * @returns {Promise<Object>} Result object with success status, file path, and metadata
  */
 export async function getStampedApprovedPlans(applicationNumber, outputDir = '/tmp') {
-  const browserbaseApiKey = process.env.BROWSERBASE_API_KEY;
-  const browserbaseProjectId = process.env.BROWSERBASE_PROJECT_ID;
-
-  if (!browserbaseApiKey || !browserbaseProjectId) {
-    throw new Error('BrowserBase credentials not configured');
-  }
-
-  let browser;
+  let context;
 
   try {
-    browser = await chromium.connectOverCDP(
-      `wss://connect.browserbase.com?apiKey=${browserbaseApiKey}&projectId=${browserbaseProjectId}`,
-      { timeout: 25000 }
-    );
-
-    const context = browser.contexts()[0];
-    const page = context.pages()[0] || await context.newPage();
+    context = await pdonlinePool.acquire();
+    const page = await context.newPage();
     page.setDefaultTimeout(8000);
 
-    // Navigate and accept terms
-    await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { waitUntil: 'domcontentloaded' });
-    await page.click('a:has-text("All applications")');
+    // Text and PDF bytes are all we need - skip images, fonts and styles
+    await blockStaticAssets(page);
+
+    // Navigate and accept terms - wait only for the link we need, not the full load
+    await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { waitUntil: 'commit' });
+    const allApplicationsLink = await page.waitForSelector('a:has-text("All applications")', { state: 'visible' });
+    await allApplicationsLink.click();
     await page.click('input#ctl00_MainBodyContent_mDataList_ctl03_mDataGrid_ctl02_ctl00');
     await page.click('input[type="submit"][value="Next"]');
 
@@ -280,7 +337,6 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
     // Click into first result
     const firstLink = await page.$('table#gridResults tr.ContentPanel td:first-child a, table#gridResults tr.AlternateContentPanel td:first-child a');
     if (!firstLink) {
-      await browser.close();
       return { success: false, error: 'No results found for application number', filePath: null };
     }
 
@@ -289,38 +345,52 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
     // Access documents iframe
     const iframeElement = await page.waitForSelector('iframe.resp-iframe', { timeout: 12000 });
     const iframe = await iframeElement.contentFrame();
-    await iframe.waitForSelector('table.dataTable', { timeout: 15000 });
+    // The documents grid populates asynchronously inside the iframe; rechecking
+    // on each animation frame picks it up faster than interval polling
+    await iframe.waitForFunction(
+      () => {
+        const table = document.querySelector('table.dataTable');
+        return !!table && table.rows.length > 0;
+      },
+      null,
+      { polling: 'raf', timeout: 15000 }
+    );
 
     // Search all pages for Stamped Approved Plans
-    const stampedPattern = /stamped.*(approved|approval).*plan|stamped.*plan/i;
     let stampedInfo = null;
     let pageNum = 1;
     let foundPage = null;
 
     while (true) {
-      const docsTable = await iframe.$('table.dataTable');
-      if (!docsTable) break;
-
-      const rows = await docsTable.$$('tr');
-
-      for (const row of rows) {
-        const cells = await row.$$('td');
-        if (cells.length >= 4) {
-          const linkText = (await cells[0].innerText()).trim();
-          const nameText = (await cells[1].innerText()).trim();
-
-          if (stampedPattern.test(nameText)) {
-            stampedInfo = { linkText, name: nameText, page: pageNum };
-            foundPage = pageNum;
-            break;
-          }
+      // Single round-trip per page, same as the decision notice scan
+      const rowTexts = await iframe.evaluate(() => {
+        const table = document.querySelector('table.dataTable');
+        if (!table) return null;
+        return Array.from(table.querySelectorAll('tr')).map(row => {
+          const cells = row.querySelectorAll('td');
+          if (cells.length < 4) return null;
+          return {
+            linkText: cells[0].innerText.trim(),
+            nameText: cells[1].innerText.trim()
+          };
+        }).filter(Boolean);
+      });
+      if (rowTexts === null) break;
+
+      for (const { linkText, nameText } of rowTexts) {
+        if (STAMPED_PLANS_RE.test(nameText)) {
+          stampedInfo = { linkText, name: nameText, page: pageNum };
+          foundPage = pageNum;
+          break;
         }
       }
 
       if (stampedInfo) break;
 
-      const nextButton = await iframe.$('a:has-text("Next")');
-      if (nextButton && !(await nextButton.getAttribute('class') || '').includes('disabled')) {
+      // Fold the disabled check into the selector - one element resolution
+      // instead of a lookup plus a class-attribute round-trip
+      const nextButton = await iframe.$('a:has-text("Next"):not([class*="disabled"])');
+      if (nextButton) {
         await nextButton.click();
         await iframe.waitForLoadState('domcontentloaded');
         pageNum += 1;
@@ -331,7 +401,6 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
     }
 
     if (!stampedInfo) {
-      await browser.close();
       return { success: false, error: 'No Stamped Approved Plans found', filePath: null };
     }
 
@@ -356,56 +425,69 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
       }
     }
 
-    // Find the download link on current page
-    const docsTable = await iframe.$('table.dataTable');
-    let stampedLink = null;
-
-    if (docsTable) {
-      const rows = await docsTable.$$('tr');
-      for (const row of rows) {
-        const cells = await row.$$('td');
-        if (cells.length >= 4) {
-          const linkText = (await cells[0].innerText()).trim();
-          if (linkText === stampedInfo.linkText) {
-            stampedLink = await cells[0].$('a');
-            break;
-          }
+    // Find the download link on current page - single in-page pass, as above
+    const linkHandle = await iframe.evaluateHandle((targetText) => {
+      for (const row of document.querySelectorAll('table.dataTable tr')) {
+        const cells = row.querySelectorAll('td');
+        if (cells.length >= 4 && cells[0].innerText.trim() === targetText) {
+          return cells[0].querySelector('a');
         }
       }
-    }
+      return null;
+    }, stampedInfo.linkText);
+    const stampedLink = linkHandle.asElement();
 
     if (!stampedLink) {
-      await browser.close();
       return { success: false, error: `Could not find link ${stampedInfo.linkText}`, filePath: null };
     }
 
-    // Intercept PDF download
+    // Try a direct fetch through the context's request client first - same
+    // approach as the decision notice path
     let pdfBuffer = null;
-    let interceptResolve = null;
-    const interceptPromise = new Promise((resolve) => { interceptResolve = resolve; });
 
-    const routeHandler = async (route, request) => {
-      const response = await route.fetch();
-      const contentType = response.headers()['content-type'] || '';
+    const href = await stampedLink.getAttribute('href');
+    if (href && !href.toLowerCase().startsWith('javascript')) {
+      try {
+        const pdfUrl = new URL(href, iframe.url()).toString();
+        const directResponse = await page.request.get(pdfUrl);
+        const directType = directResponse.headers()['content-type'] || '';
 
-      if (contentType.includes('application/pdf') || contentType.includes('octet-stream')) {
-        pdfBuffer = await response.body();
-        interceptResolve();
+        if (directResponse.ok() && (directType.includes('application/pdf') || directType.includes('octet-stream'))) {
+          pdfBuffer = await directResponse.body();
+        }
+      } catch (directErr) {
+        console.log('[PDONLINE-DOCS] Direct PDF fetch failed, falling back to click:', directErr.message);
       }
+    }
 
-      await route.fulfill({ response });
-    };
+    if (!pdfBuffer) {
+      // Intercept PDF download
+      let interceptResolve = null;
+      const interceptPromise = new Promise((resolve) => { interceptResolve = resolve; });
+
+      const routeHandler = async (route, request) => {
+        const response = await route.fetch();
+        const contentType = response.headers()['content-type'] || '';
+
+        if (contentType.includes('application/pdf') || contentType.includes('octet-stream')) {
+          pdfBuffer = await response.body();
+          interceptResolve();
+        }
 
-    await page.route('**/*', routeHandler);
-    await stampedLink.click();
+        await route.fulfill({ response });
+      };
 
-    const timeout = setTimeout(() => {
-      if (!pdfBuffer) interceptResolve();
-    }, 30000);
+      await page.route('**/*', routeHandler);
+      await stampedLink.click();
 
-    await interceptPromise;
-    clearTimeout(timeout);
-    await page.unroute('**/*', routeHandler);
+      const timeout = setTimeout(() => {
+        if (!pdfBuffer) interceptResolve();
+      }, 30000);
+
+      await interceptPromise;
+      clearTimeout(timeout);
+      await page.unroute('**/*', routeHandler);
+    }
 
     if (!pdfBuffer) {
       throw new Error('Failed to capture PDF');
@@ -425,8 +507,6 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
     fs.writeFileSync(filePath, pdfBuffer);
     const fileSizeKB = (pdfBuffer.length / 1024).toFixed(2);
 
-    await browser.close();
-
     return {
       success: true,
       filePath,
@@ -439,16 +519,11 @@ export async function getStampedApprovedPlans(applicationNumber, outputDir = '/t
 
   } catch (error) {
     console.error('[PDONLINE-DOCS ERROR]', error.message);
-
-    if (browser) {
-      try {
-        await browser.close();
-      } catch (closeError) {
-        // Silent fail on close error
-      }
-    }
-
     throw new Error(`Stamped approved plans download failed: ${error.message}`);
+  } finally {
+    if (context) {
+      await pdonlinePool.release(context);
+    }
   }
 }
 
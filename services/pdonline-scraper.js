@@ -1,285 +1,393 @@
-import { chromium } from 'playwright-core';
+import { pdonlinePool, blockStaticAssets } from './browser-pool.js';
 
-export async function scrapeGoldCoastDAs(address, monthsBack = 12) {
-  console.log('===========================================');
-  console.log('[PDONLINE] Starting scraper');
-  console.log('[PDONLINE] Address received:', address);
-  console.log('[PDONLINE] Months back:', monthsBack);
-  console.log('===========================================');
+const MAX_PARALLEL_PAGES = 3;
+
+// Verbose step/per-row logging is useful when the portal changes layout but
+// costs formatting work on every run - opt in via PDONLINE_DEBUG=true
+const DEBUG = process.env.PDONLINE_DEBUG === 'true';
+
+function debugLog(...args) {
+  if (DEBUG) console.log(...args);
+}
 
-  const browserbaseApiKey = process.env.BROWSERBASE_API_KEY;
-  const browserbaseProjectId = process.env.BROWSERBASE_PROJECT_ID;
+// Detail-page extraction patterns - compiled once rather than per application
+// inside the details loop
+const DESCRIPTION_RE = /Application description<\/span><div class="AlternateContentText"[^>]*>([^<]+(?:<[^\/][^>]*>[^<]*<\/[^>]+>)*[^<]*)<\/div>/i;
+const STATUS_RE = /Status<\/span><div class="AlternateContentText"[^>]*>([^<]+(?:<[^\/][^>]*>[^<]*<\/[^>]+>)*[^<]*)<\/div>/i;
+const HTML_TAG_RE = /<[^>]+>/g;
 
-  if (!browserbaseApiKey || !browserbaseProjectId) {
-    console.error('[PDONLINE] Missing BrowserBase credentials');
-    throw new Error('BrowserBase credentials not configured');
+function parseAddress(address) {
+  // Parse address: "43 Peerless Avenue, MERMAID BEACH, 4218"
+  const parts = address.split(',').map(p => p.trim());
+  if (parts.length < 2) {
+    throw new Error('Invalid address format - need at least street and suburb');
   }
 
-  console.log('[PDONLINE] BrowserBase API Key:', browserbaseApiKey ? 'SET' : 'MISSING');
-  console.log('[PDONLINE] BrowserBase Project ID:', browserbaseProjectId);
+  const streetPart = parts[0];
+  const tokens = streetPart.split(' ');
 
-  let browser;
+  if (tokens.length < 3) {
+    throw new Error('Invalid street address format - need number, name, and type');
+  }
+
+  return {
+    streetNumber: tokens[0],
+    streetType: tokens[tokens.length - 1],
+    streetName: tokens.slice(1, -1).join(' ')
+  };
+}
+
+async function scrapeWithPage(page, address, monthsBack) {
+  debugLog('[PDONLINE] Parsing address:', address);
+
+  const { streetNumber, streetName, streetType } = parseAddress(address);
+
+  debugLog('[PDONLINE] Parsed:', { streetNumber, streetName, streetType });
+  debugLog('[PDONLINE] Navigating to PDOnline...');
+
+  // We only read text and click links - skip images, fonts and styles.
+  // Register once per page so session reuse doesn't stack route handlers.
+  if (!page.__staticAssetsBlocked) {
+    await blockStaticAssets(page);
+    page.__staticAssetsBlocked = true;
+  }
 
+  // Navigate through PDOnline - return as soon as the navigation commits and
+  // the link we actually need is interactive, rather than waiting out the
+  // whole page load
+  await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { waitUntil: 'commit', timeout: 30000 });
+  // Reuse the handle each wait returns instead of resolving the selector again
+  const allApplicationsLink = await page.waitForSelector('a:has-text("All applications")', { state: 'visible', timeout: 15000 });
+  debugLog('[PDONLINE] ✅ Loaded homepage');
+
+  await allApplicationsLink.click();
+  // Wait for the actual next-step marker rather than network idle - the terms
+  // checkbox appearing means the page is usable
+  const termsCheckbox = await page.waitForSelector('input#ctl00_MainBodyContent_mDataList_ctl03_mDataGrid_ctl02_ctl00', { timeout: 10000 });
+  debugLog('[PDONLINE] ✅ Clicked All applications');
+
+  await termsCheckbox.click();
+  await page.click('input[type="submit"][value="Next"]');
+  const addressSearchLink = await page.waitForSelector('a:has-text("Address search")', { timeout: 10000 });
+  debugLog('[PDONLINE] ✅ Accepted terms');
+
+  await addressSearchLink.click();
+  const streetNameInput = await page.waitForSelector('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetNameTextBox', { timeout: 10000 });
+  debugLog('[PDONLINE] ✅ Opened address search');
+
+  // Fill search form
+  if (streetNumber) {
+    await page.fill('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetNumberTextBox', streetNumber);
+  }
+  await streetNameInput.fill(streetName);
+  await page.selectOption('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetTypeDropDown', streetType);
+  debugLog('[PDONLINE] ✅ Filled search form');
+
+  await page.click('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mSearchButton');
+  debugLog('[PDONLINE] ✅ Submitted search');
+
+  // The search either lands on EnquirySummaryView with a results grid or on a
+  // no-results page. Race both signals instead of waiting load -> check URL ->
+  // wait for table in sequence.
+  let hasResults;
   try {
-    console.log('[PDONLINE] Parsing address:', address);
-    
-    // Parse address: "43 Peerless Avenue, MERMAID BEACH, 4218"
-    const parts = address.split(',').map(p => p.trim());
-    if (parts.length < 2) {
-      throw new Error('Invalid address format - need at least street and suburb');
-    }
-    
-    const streetPart = parts[0];
-    const tokens = streetPart.split(' ');
-    
-    if (tokens.length < 3) {
-      throw new Error('Invalid street address format - need number, name, and type');
-    }
-    
-    const streetNumber = tokens[0];
-    const streetType = tokens[tokens.length - 1];
-    const streetName = tokens.slice(1, -1).join(' ');
-    
-    console.log('[PDONLINE] Parsed:', { streetNumber, streetName, streetType });
-    
-    // Connect to BrowserBase
-    console.log('[PDONLINE] Connecting to BrowserBase...');
-    
-    try {
-      browser = await chromium.connectOverCDP(
-        `wss://connect.browserbase.com?apiKey=${browserbaseApiKey}&projectId=${browserbaseProjectId}`,
-        { timeout: 30000 }
-      );
-      console.log('[PDONLINE] ✅ Connected to BrowserBase');
-    } catch (error) {
-      console.error('[PDONLINE] ❌ BrowserBase connection failed:', error.message);
-      throw new Error(`BrowserBase connection failed: ${error.message}`);
-    }
-    
-    const context = browser.contexts()[0];
-    const page = context.pages()[0] || await context.newPage();
-    
-    console.log('[PDONLINE] Navigating to PDOnline...');
-    
-    // Navigate through PDOnline
-    await page.goto('https://cogc.cloud.infor.com/ePathway/epthprod/Web/default.aspx', { timeout: 30000 });
-    await page.waitForLoadState('networkidle', { timeout: 30000 });
-    console.log('[PDONLINE] ✅ Loaded homepage');
-    
-    await page.click('a:has-text("All applications")');
-    await page.waitForLoadState('networkidle', { timeout: 30000 });
-    console.log('[PDONLINE] ✅ Clicked All applications');
-    
-    await page.click('input#ctl00_MainBodyContent_mDataList_ctl03_mDataGrid_ctl02_ctl00');
-    await page.click('input[type="submit"][value="Next"]');
-    await page.waitForLoadState('networkidle', { timeout: 30000 });
-    console.log('[PDONLINE] ✅ Accepted terms');
-    
-    await page.click('a:has-text("Address search")');
-    await page.waitForSelector('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetNameTextBox', { timeout: 30000 });
-    console.log('[PDONLINE] ✅ Opened address search');
-    
-    // Fill search form
-    if (streetNumber) {
-      await page.fill('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetNumberTextBox', streetNumber);
-    }
-    await page.fill('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetNameTextBox', streetName);
-    await page.selectOption('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mTabControl_ctl09_mStreetTypeDropDown', streetType);
-    console.log('[PDONLINE] ✅ Filled search form');
-    
-    await page.click('#ctl00_MainBodyContent_mGeneralEnquirySearchControl_mSearchButton');
-    await page.waitForLoadState('networkidle', { timeout: 30000 });
-    console.log('[PDONLINE] ✅ Submitted search');
-    
-    if (!page.url().includes('EnquirySummaryView')) {
-      console.log('[PDONLINE] No results found');
-      await browser.close();
-      return { success: true, count: 0, applications: [] };
+    hasResults = await Promise.race([
+      page.waitForSelector('table#gridResults', { timeout: 20000 }).then(() => true),
+      page.waitForLoadState('domcontentloaded', { timeout: 20000 }).then(() =>
+        // On the results page, keep waiting for the grid branch to win
+        page.url().includes('EnquirySummaryView') ? new Promise(() => {}) : false
+      )
+    ]);
+  } catch (error) {
+    console.error('[PDONLINE] Results table not found:', error.message);
+    hasResults = false;
+  }
+
+  if (!hasResults) {
+    console.log('[PDONLINE] No results found');
+    return { success: true, count: 0, applications: [] };
+  }
+
+  // Save the results URL for returning to it
+  const resultsUrl = page.url();
+  debugLog('[PDONLINE] Results URL:', resultsUrl);
+  debugLog('[PDONLINE] ✅ Found results table');
+
+  // FIRST PASS: Collect all basic data from the table WITHOUT clicking into
+  // details - one pass builds the finished application objects, including the
+  // date-range flag, rather than extracting and then reshaping in a second loop
+  const cutoffDate = new Date();
+  cutoffDate.setMonth(cutoffDate.getMonth() - monthsBack);
+
+  const applications = await page.$$eval(
+    'table#gridResults tr.ContentPanel, table#gridResults tr.AlternateContentPanel',
+    (rows, cutoffTime) => {
+      return rows.map(row => {
+        const cells = row.querySelectorAll('td');
+        if (cells.length < 5) return null;
+
+        const dateStr = cells[1]?.innerText?.trim() || '';
+        const [day, month, year] = dateStr.split('/');
+        const appDate = new Date(year, month - 1, day);
+
+        return {
+          application_number: cells[0]?.innerText?.trim() || '',
+          lodgement_date: dateStr,
+          location: cells[2]?.innerText?.trim() || '',
+          application_type: cells[3]?.innerText?.trim() || '',
+          suburb: cells[4]?.innerText?.trim() || '',
+          within_date_range: appDate.getTime() >= cutoffTime,
+          details_fetched: false
+        };
+      }).filter(Boolean);
+    },
+    cutoffDate.getTime()
+  );
+
+  console.log('[PDONLINE] Found', applications.length, 'result rows');
+
+  for (const app of applications) {
+    debugLog('[PDONLINE] Found:', app.application_number, '- Within range:', app.within_date_range);
+  }
+
+  // SECOND PASS: Fetch details for applications within date range
+  // We navigate fresh each time to avoid stale element issues
+  for (let i = 0; i < applications.length; i++) {
+    const app = applications[i];
+
+    if (!app.within_date_range) {
+      debugLog('[PDONLINE] Skipping details for', app.application_number, '(outside date range)');
+      continue;
     }
-    
-    // Save the results URL for returning to it
-    const resultsUrl = page.url();
-    console.log('[PDONLINE] Results URL:', resultsUrl);
-    
+
     try {
+      debugLog('[PDONLINE] Fetching details for', app.application_number);
+
+      // Go back to results page fresh - the grid appearing is the real signal
+      await page.goto(resultsUrl, { timeout: 30000 });
       await page.waitForSelector('table#gridResults', { timeout: 10000 });
-      console.log('[PDONLINE] ✅ Found results table');
-    } catch (error) {
-      console.error('[PDONLINE] Results table not found:', error.message);
-      await browser.close();
-      return { success: true, count: 0, applications: [] };
-    }
-    
-    // FIRST PASS: Collect all basic data from the table WITHOUT clicking into details
-    const applications = [];
-    const cutoffDate = new Date();
-    cutoffDate.setMonth(cutoffDate.getMonth() - monthsBack);
-    
-    // Get all rows and extract basic info first
-    const rowsData = await page.$$eval(
-      'table#gridResults tr.ContentPanel, table#gridResults tr.AlternateContentPanel',
-      (rows) => {
-        return rows.map(row => {
-          const cells = row.querySelectorAll('td');
-          if (cells.length < 5) return null;
-          
-          return {
-            appNumber: cells[0]?.innerText?.trim() || '',
-            dateStr: cells[1]?.innerText?.trim() || '',
-            location: cells[2]?.innerText?.trim() || '',
-            appType: cells[3]?.innerText?.trim() || '',
-            suburb: cells[4]?.innerText?.trim() || ''
-          };
-        }).filter(Boolean);
+
+      // Find and click the link for this specific application
+      const link = await page.$(`a:has-text("${app.application_number}")`);
+      if (!link) {
+        console.log('[PDONLINE] Could not find link for', app.application_number);
+        continue;
       }
-    );
-    
-    console.log('[PDONLINE] Found', rowsData.length, 'result rows');
-    
-    // Process each row's basic data
-    for (const rowData of rowsData) {
-      const [day, month, year] = rowData.dateStr.split('/');
-      const appDate = new Date(year, month - 1, day);
-      const withinRange = appDate >= cutoffDate;
-      
-      const app = {
-        application_number: rowData.appNumber,
-        lodgement_date: rowData.dateStr,
-        location: rowData.location,
-        application_type: rowData.appType,
-        suburb: rowData.suburb,
-        within_date_range: withinRange,
-        details_fetched: false
-      };
-      
-      console.log('[PDONLINE] Found:', app.application_number, '- Within range:', withinRange);
-      applications.push(app);
-    }
-    
-    // SECOND PASS: Fetch details for applications within date range
-    // We navigate fresh each time to avoid stale element issues
-    for (let i = 0; i < applications.length; i++) {
-      const app = applications[i];
-      
-      if (!app.within_date_range) {
-        console.log('[PDONLINE] Skipping details for', app.application_number, '(outside date range)');
+
+      await link.click();
+      await page.waitForLoadState('domcontentloaded', { timeout: 15000 });
+
+      // Check we're on a detail page
+      if (page.url().includes('Error.aspx')) {
+        console.log('[PDONLINE] Error page for', app.application_number);
         continue;
       }
-      
+
+      // Wait for details to load
       try {
-        console.log('[PDONLINE] Fetching details for', app.application_number);
-        
-        // Go back to results page fresh
-        await page.goto(resultsUrl, { timeout: 30000 });
-        await page.waitForLoadState('networkidle', { timeout: 30000 });
-        await page.waitForSelector('table#gridResults', { timeout: 10000 });
-        
-        // Find and click the link for this specific application
-        const link = await page.$(`a:has-text("${app.application_number}")`);
-        if (!link) {
-          console.log('[PDONLINE] Could not find link for', app.application_number);
-          continue;
-        }
-        
-        await link.click();
-        await page.waitForLoadState('networkidle', { timeout: 30000 });
-        
-        // Check we're on a detail page
-        if (page.url().includes('Error.aspx')) {
-          console.log('[PDONLINE] Error page for', app.application_number);
-          continue;
-        }
-        
-        // Wait for details to load
-        try {
-          await page.waitForSelector('fieldset legend:has-text("Details")', { timeout: 10000 });
-        } catch (e) {
-          console.log('[PDONLINE] Details section not found for', app.application_number);
-          continue;
-        }
-        
-        const html = await page.content();
-        
-        // Extract description
-        const descMatch = html.match(/Application description<\/span><div class="AlternateContentText"[^>]*>([^<]+(?:<[^\/][^>]*>[^<]*<\/[^>]+>)*[^<]*)<\/div>/i);
-        if (descMatch) {
-          app.application_description = descMatch[1].replace(/<[^>]+>/g, '').trim().replace(/\s+/g, ' ');
-        }
-        
-        // Extract status
-        const statusMatch = html.match(/Status<\/span><div class="AlternateContentText"[^>]*>([^<]+(?:<[^\/][^>]*>[^<]*<\/[^>]+>)*[^<]*)<\/div>/i);
-        if (statusMatch) {
-          app.status = statusMatch[1].replace(/<[^>]+>/g, '').trim().replace(/\s+/g, ' ');
-        }
+        await page.waitForSelector('fieldset legend:has-text("Details")', { timeout: 10000 });
+      } catch (e) {
+        console.log('[PDONLINE] Details section not found for', app.application_number);
+        continue;
+      }
 
-        // Navigate to documents tab and find Stamped Approved Plans
-        try {
-          const docsTab = await page.$('a:has-text("Documents")');
-          if (docsTab) {
-            await docsTab.click();
-            await page.waitForLoadState('networkidle', { timeout: 15000 });
-          }
+      const html = await page.content();
+
+      // Extract description
+      const descMatch = html.match(DESCRIPTION_RE);
+      if (descMatch) {
+        app.application_description = descMatch[1].replace(HTML_TAG_RE, '').trim().replace(/\s+/g, ' ');
+      }
+
+      // Extract status
+      const statusMatch = html.match(STATUS_RE);
+      if (statusMatch) {
+        app.status = statusMatch[1].replace(HTML_TAG_RE, '').trim().replace(/\s+/g, ' ');
+      }
+
+      // Navigate to documents tab and find Stamped Approved Plans
+      try {
+        const docsTab = await page.$('a:has-text("Documents")');
+        if (docsTab) {
+          await docsTab.click();
+          await page.waitForLoadState('domcontentloaded', { timeout: 15000 });
+          await page.waitForSelector('table tr', { timeout: 10000 });
+        }
 
-          // Look for Stamped Approved Plans in the documents table
-          const stampedDoc = await page.$$eval(
-            'table tr',
-            (rows) => {
-              for (const row of rows) {
-                const nameCell = row.querySelector('td:nth-child(2)');
-                if (!nameCell) continue;
-                const name = nameCell.innerText.trim();
-                if (/stamped.*(approved|approval).*plan|stamped.*plan/i.test(name)) {
-                  const linkCell = row.querySelector('td:nth-child(1) a');
-                  return {
-                    name,
-                    href: linkCell ? linkCell.href : null,
-                    text: linkCell ? linkCell.innerText.trim() : null
-                  };
-                }
+        // Look for Stamped Approved Plans in the documents table
+        const stampedDoc = await page.$$eval(
+          'table tr',
+          (rows) => {
+            for (const row of rows) {
+              const nameCell = row.querySelector('td:nth-child(2)');
+              if (!nameCell) continue;
+              const name = nameCell.innerText.trim();
+              if (/stamped.*(approved|approval).*plan|stamped.*plan/i.test(name)) {
+                const linkCell = row.querySelector('td:nth-child(1) a');
+                return {
+                  name,
+                  href: linkCell ? linkCell.href : null,
+                  text: linkCell ? linkCell.innerText.trim() : null
+                };
               }
-              return null;
             }
-          );
-
-          if (stampedDoc) {
-            app.stamped_approved_plans = stampedDoc;
-            console.log('[PDONLINE] ✅ Found Stamped Approved Plans for', app.application_number, ':', stampedDoc.text);
-          } else {
-            console.log('[PDONLINE] No Stamped Approved Plans found for', app.application_number);
+            return null;
           }
-        } catch (docErr) {
-          console.log('[PDONLINE] Could not fetch documents for', app.application_number, ':', docErr.message);
-        }
+        );
 
-        app.details_fetched = true;
-        console.log('[PDONLINE] ✅ Fetched details for', app.application_number);
-        
-      } catch (err) {
-        console.error('[PDONLINE] Error fetching details for', app.application_number, ':', err.message);
+        if (stampedDoc) {
+          app.stamped_approved_plans = stampedDoc;
+          debugLog('[PDONLINE] ✅ Found Stamped Approved Plans for', app.application_number, ':', stampedDoc.text);
+        } else {
+          debugLog('[PDONLINE] No Stamped Approved Plans found for', app.application_number);
+        }
+      } catch (docErr) {
+        console.log('[PDONLINE] Could not fetch documents for', app.application_number, ':', docErr.message);
       }
+
+      app.details_fetched = true;
+      debugLog('[PDONLINE] ✅ Fetched details for', app.application_number);
+
+    } catch (err) {
+      console.error('[PDONLINE] Error fetching details for', app.application_number, ':', err.message);
     }
-    
-    await browser.close();
-    console.log('[PDONLINE] ✅ Complete - found', applications.length, 'applications');
-    
-    return {
-      success: true,
-      count: applications.length,
-      applications
-    };
-    
+  }
+
+  console.log('[PDONLINE] ✅ Complete - found', applications.length, 'applications');
+
+  return {
+    success: true,
+    count: applications.length,
+    applications
+  };
+}
+
+export async function scrapeGoldCoastDAs(address, monthsBack = 12) {
+  console.log('===========================================');
+  console.log('[PDONLINE] Starting scraper');
+  console.log('[PDONLINE] Address received:', address);
+  console.log('[PDONLINE] Months back:', monthsBack);
+  console.log('===========================================');
+
+  let context;
+
+  try {
+    try {
+      context = await pdonlinePool.acquire();
+    } catch (error) {
+      console.error('[PDONLINE] ❌ BrowserBase connection failed:', error.message);
+      throw new Error(`BrowserBase connection failed: ${error.message}`);
+    }
+
+    const page = await context.newPage();
+
+    return await scrapeWithPage(page, address, monthsBack);
+
   } catch (error) {
     console.error('[PDONLINE ERROR]', error.message);
     console.error('[PDONLINE ERROR STACK]', error.stack);
-    
-    if (browser) {
-      try {
-        await browser.close();
-      } catch (closeError) {
-        console.error('[PDONLINE] Error closing browser:', closeError.message);
+
+    throw new Error(`PDOnline scraping failed: ${error.message}`);
+  } finally {
+    if (context) {
+      await pdonlinePool.release(context);
+    }
+  }
+}
+
+/**
+ * Scrape DAs for multiple addresses over a single BrowserBase connection.
+ * Each address runs in its own exclusively-held browser context - ePathway
+ * keeps enquiry state in a server-side session keyed by cookies, so two
+ * scrapes sharing a cookie jar would read each other's results. At most
+ * maxParallel run concurrently (capped at pool capacity); the workload is
+ * network-bound, so this cuts wall time roughly linearly up to the cap.
+ *
+ * @param {string[]} addresses - Addresses to search
+ * @param {number} monthsBack - How far back to fetch details (default 12)
+ * @param {number} maxParallel - Concurrent pages cap (default MAX_PARALLEL_PAGES)
+ * @returns {Promise<Array>} One result per address, in input order
+ */
+export async function scrapeManyGoldCoastDAs(addresses, monthsBack = 12, maxParallel = MAX_PARALLEL_PAGES) {
+  console.log('[PDONLINE] Batch scrape for', addresses.length, 'addresses, max parallel:', maxParallel);
+
+  try {
+    const results = new Array(addresses.length);
+    let nextIndex = 0;
+
+    const worker = async () => {
+      while (nextIndex < addresses.length) {
+        const i = nextIndex++;
+        const address = addresses[i];
+        let context;
+
+        try {
+          context = await pdonlinePool.acquire();
+          const page = await context.newPage();
+          results[i] = { address, ...(await scrapeWithPage(page, address, monthsBack)) };
+        } catch (err) {
+          console.error('[PDONLINE] Batch item failed for', address, ':', err.message);
+          results[i] = { address, success: false, error: err.message, count: 0, applications: [] };
+        } finally {
+          if (context) {
+            await pdonlinePool.release(context);
+          }
+        }
       }
+    };
+
+    // Never spin up more workers than the pool can serve - extra workers
+    // would just queue on acquire() and risk timing out behind the others
+    const workerCount = Math.min(maxParallel, addresses.length, pdonlinePool.maxSize);
+    const workers = [];
+    for (let w = 0; w < workerCount; w++) {
+      workers.push(worker());
     }
-    
-    throw new Error(`PDOnline scraping failed: ${error.message}`);
+    await Promise.all(workers);
+
+    return results;
+
+  } catch (error) {
+    console.error('[PDONLINE ERROR]', error.message);
+    throw new Error(`PDOnline batch scraping failed: ${error.message}`);
   }
 }
+
+/**
+ * Create a session that keeps one warm context and page pinned across
+ * successive queries - useful when a caller issues several searches in a row
+ * and doesn't want to pay checkout/page setup per address.
+ *
+ * Always close() the session in a finally block. Sessions that leak are not
+ * fatal - the pool reclaims contexts held past maxAgeMs and acquire() times
+ * out rather than hanging - but a leaked session wastes a pool slot until
+ * the reclaim fires.
+ *
+ * Usage:
+ *   const session = createScraperSession();
+ *   const a = await session.scrape('43 Peerless Avenue, MERMAID BEACH, 4218');
+ *   const b = await session.scrape('22 Mary Avenue, BROADBEACH, 4218');
+ *   await session.close();
+ */
+export function createScraperSession() {
+  let context = null;
+  let page = null;
+
+  return {
+    async scrape(address, monthsBack = 12) {
+      if (!context) {
+        context = await pdonlinePool.acquire();
+        page = await context.newPage();
+      }
+      return scrapeWithPage(page, address, monthsBack);
+    },
+
+    async close() {
+      if (context) {
+        await pdonlinePool.release(context);
+        context = null;
+        page = null;
+      }
+    }
+  };
+}
@@ -0,0 +1,178 @@
+// Test script for BrowserPool checkout semantics
+// Uses a stubbed browser - no BrowserBase connection or credentials needed
+
+import { BrowserPool } from './services/browser-pool.js';
+
+function makeStubBrowser() {
+  let counter = 0;
+
+  function makeStubContext(name) {
+    return {
+      name,
+      closed: false,
+      _pages: [],
+      pages() { return this._pages.filter(p => !p.closed); },
+      async newPage() {
+        const page = { closed: false, async close() { this.closed = true; } };
+        this._pages.push(page);
+        return page;
+      },
+      _cookies: [],
+      async cookies() { return this._cookies; },
+      async addCookies(cookies) { this._cookies.push(...cookies); },
+      async clearCookies() { this._cookies = []; },
+      async close() { this.closed = true; }
+    };
+  }
+
+  const defaultContext = makeStubContext('default');
+
+  return {
+    isConnected: () => true,
+    contexts: () => [defaultContext],
+    newContext: async () => {
+      // Yield once so concurrent creators interleave, like a real CDP call
+      await new Promise(resolve => setImmediate(resolve));
+      return makeStubContext(`ctx-${++counter}`);
+    },
+    async close() {}
+  };
+}
+
+function makeStubbedPool(options) {
+  const pool = new BrowserPool(options);
+  const browser = makeStubBrowser();
+  pool._getBrowser = async () => {
+    pool._browser = browser;
+    return browser;
+  };
+  return pool;
+}
+
+const tests = [
+  {
+    name: 'Concurrent acquires return distinct contexts',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 3 });
+      const contexts = await Promise.all([pool.acquire(), pool.acquire(), pool.acquire()]);
+      const names = contexts.map(c => c.name);
+      console.log(`   Acquired contexts: ${names.join(' ')}`);
+      return new Set(names).size === 3;
+    }
+  },
+  {
+    name: 'Pool never exceeds maxSize under concurrent load',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 2 });
+      let fourthResolved = false;
+      const first = await pool.acquire();
+      const second = await pool.acquire();
+      const blocked = pool.acquire().then(c => { fourthResolved = true; return c; });
+      await new Promise(resolve => setTimeout(resolve, 20));
+      if (fourthResolved) {
+        console.log('   Third acquire resolved while pool was full');
+        return false;
+      }
+      await pool.release(first);
+      const third = await blocked;
+      console.log(`   Third acquire waited for release, got: ${third.name}`);
+      return third === first && second !== third;
+    }
+  },
+  {
+    name: 'Release only closes pages on the returned context',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 2 });
+      const a = await pool.acquire();
+      const b = await pool.acquire();
+      await a.newPage();
+      const bPage = await b.newPage();
+      await pool.release(a);
+      console.log(`   Other holder's page closed: ${bPage.closed}`);
+      return !bPage.closed && a.pages().length === 0;
+    }
+  },
+  {
+    name: 'Acquire times out instead of hanging when the pool is exhausted',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 1, acquireTimeoutMs: 30 });
+      await pool.acquire(); // never released - simulates a leaked holder
+      try {
+        await pool.acquire();
+        console.log('   Second acquire resolved despite full pool');
+        return false;
+      } catch (err) {
+        console.log(`   Second acquire rejected: ${err.message}`);
+        return /Timed out/.test(err.message);
+      }
+    }
+  },
+  {
+    name: 'Released context is reused by the next acquire',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 3 });
+      const a = await pool.acquire();
+      await pool.release(a);
+      const again = await pool.acquire();
+      console.log(`   First: ${a.name}, reacquired: ${again.name}`);
+      return again === a;
+    }
+  },
+  {
+    name: 'warmUp prewarms minSize contexts for instant checkout',
+    async run() {
+      const pool = makeStubbedPool({ minSize: 2, maxSize: 3 });
+      await pool.warmUp();
+      const idle = pool._idle.length;
+      const a = await pool.acquire();
+      const b = await pool.acquire();
+      console.log(`   Idle after warmUp: ${idle}, checkouts: ${a.name} ${b.name}`);
+      return idle === 2 && a !== b;
+    }
+  },
+  {
+    name: 'Recycled context starts with a fresh cookie jar',
+    async run() {
+      const pool = makeStubbedPool({ maxSize: 1 });
+      const a = await pool.acquire();
+      await a.addCookies([{ name: 'ASP.NET_SessionId', value: 'stale' }]);
+      await pool.release(a);
+      const again = await pool.acquire();
+      const cookies = await again.cookies();
+      console.log(`   Cookies after recycle: ${cookies.length}`);
+      return again === a && cookies.length === 0;
+    }
+  }
+];
+
+let passed = 0;
+let failed = 0;
+
+for (const [index, test] of tests.entries()) {
+  let ok = false;
+  try {
+    ok = await test.run();
+  } catch (err) {
+    console.log(`   Threw: ${err.message}`);
+  }
+
+  if (ok) {
+    passed++;
+    console.log(`✅ Test ${index + 1}: ${test.name} - PASSED`);
+  } else {
+    failed++;
+    console.log(`❌ Test ${index + 1}: ${test.name} - FAILED`);
+  }
+  console.log('');
+}
+
+console.log('='.repeat(60));
+console.log(`\n📊 Results: ${passed} passed, ${failed} failed out of ${tests.length} tests`);
+
+if (failed === 0) {
+  console.log('🎉 All tests passed!');
+  process.exit(0);
+} else {
+  console.log('⚠️  Some tests failed');
+  process.exit(1);
+}